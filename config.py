@@ -2,44 +2,56 @@
 Configuration settings for EmotiBot
 """
 import os
-from dotenv import load_dotenv
+from dataclasses import dataclass
+from functools import lru_cache
 
-# Load environment variables
-load_dotenv()
+from dotenv import load_dotenv
 
-class Config:
+@dataclass(frozen=True, slots=True)
+class Settings:
     # API Keys
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    SUPABASE_URL = os.getenv("SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-    
+    google_api_key: str
+    openai_api_key: str
+    supabase_url: str
+    supabase_key: str
+
     # Model Settings
-    GOOGLE_MODEL = "gemini-pro"
-    OPENAI_MODEL = "gpt-3.5-turbo"
-    
+    google_model: str = "gemini-pro"
+    openai_model: str = "gpt-3.5-turbo"
+
     # Speech Settings
-    SPEECH_RATE = 150
-    SPEECH_LANG = "en"
-    
+    speech_rate: int = 150
+    speech_lang: str = "en"
+
     # Emotion Detection Settings
-    EMOTION_THRESHOLD = 0.5
-    
+    emotion_threshold: float = 0.5
+
     # Vector Database Settings
-    CHROMA_PERSIST_DIR = "./chroma_db"
-    COLLECTION_NAME = "emotibot_memory"
-    
-    @classmethod
-    def validate_config(cls):
+    chroma_persist_dir: str = "./chroma_db"
+    collection_name: str = "emotibot_memory"
+
+    def validate(self):
         """Validate that all required configuration is present"""
-        required_keys = [
-            cls.GOOGLE_API_KEY,
-            cls.OPENAI_API_KEY
-        ]
-        
-        missing_keys = [key for key in required_keys if not key]
-        
+        required = {
+            'GOOGLE_API_KEY': self.google_api_key,
+            'OPENAI_API_KEY': self.openai_api_key
+        }
+
+        missing_keys = [name for name, value in required.items() if not value]
+
         if missing_keys:
             raise ValueError(f"Missing required configuration keys: {missing_keys}")
-        
+
         return True
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load settings from the environment exactly once and cache the instance"""
+    load_dotenv()
+
+    return Settings(
+        google_api_key=os.getenv("GOOGLE_API_KEY"),
+        openai_api_key=os.getenv("OPENAI_API_KEY"),
+        supabase_url=os.getenv("SUPABASE_URL"),
+        supabase_key=os.getenv("SUPABASE_KEY")
+    )
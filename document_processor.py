@@ -5,13 +5,22 @@ Handles PDF and DOCX document reading and processing
 import PyPDF2
 from docx import Document
 import io
-from typing import List, Optional, Dict
+import numpy as np
+
+# Prefer the C-backed PDFium extractor when available; fall back to PyPDF2
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except Exception:
+    PDFIUM_AVAILABLE = False
+    pdfium = None
+from typing import List, Optional, Dict, Tuple
 import os
 import logging
 
 class DocumentProcessor:
     def __init__(self):
-        self.supported_formats = ['.pdf', '.docx', '.txt']
+        self.supported_formats = frozenset({'.pdf', '.docx', '.txt'})
         self.logger = logging.getLogger(__name__)
     
     def read_pdf(self, file_path: str) -> Optional[str]:
@@ -25,16 +34,16 @@ class DocumentProcessor:
             Extracted text or None if failed
         """
         try:
-            text = ""
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text()
-                    text += "\n"  # Add newline between pages
+            if PDFIUM_AVAILABLE:
+                pdf = pdfium.PdfDocument(file_path)
+                pages_text = [page.get_textpage().get_text_range() for page in pdf]
+            else:
+                with open(file_path, 'rb') as file:
+                    pdf_reader = PyPDF2.PdfReader(file)
+                    pages_text = [page.extract_text() for page in pdf_reader.pages]
             
-            return text.strip()
+            # Join pages with newlines in one pass instead of repeated concatenation
+            return "\n".join(pages_text).strip()
             
         except Exception as e:
             self.logger.error(f"Error reading PDF {file_path}: {e}")
@@ -51,21 +60,45 @@ class DocumentProcessor:
             Extracted text or None if failed
         """
         try:
-            text = ""
             pdf_file = io.BytesIO(pdf_bytes)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
             
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text()
-                text += "\n"
+            if PDFIUM_AVAILABLE:
+                pdf = pdfium.PdfDocument(pdf_file)
+                pages_text = [page.get_textpage().get_text_range() for page in pdf]
+            else:
+                pdf_reader = PyPDF2.PdfReader(pdf_file)
+                pages_text = [page.extract_text() for page in pdf_reader.pages]
             
-            return text.strip()
+            return "\n".join(pages_text).strip()
             
         except Exception as e:
             self.logger.error(f"Error reading PDF from bytes: {e}")
             return None
     
+    def read_pdf_stream(self, file_obj) -> Optional[str]:
+        """
+        Extract text from an open PDF file object without copying it to bytes
+        
+        Args:
+            file_obj: Binary file object positioned at the start of the PDF
+            
+        Returns:
+            Extracted text or None if failed
+        """
+        try:
+            if PDFIUM_AVAILABLE:
+                pdf = pdfium.PdfDocument(file_obj)
+                pages_text = [page.get_textpage().get_text_range() for page in pdf]
+            else:
+                pdf_reader = PyPDF2.PdfReader(file_obj)
+                pages_text = [page.extract_text() for page in pdf_reader.pages]
+            
+            return "\n".join(pages_text).strip()
+            
+        except Exception as e:
+            self.logger.error(f"Error reading PDF stream: {e}")
+            return None
+    
     def read_docx(self, file_path: str) -> Optional[str]:
         """
         Extract text from DOCX file
@@ -113,6 +146,29 @@ class DocumentProcessor:
             self.logger.error(f"Error reading DOCX from bytes: {e}")
             return None
     
+    def read_docx_stream(self, file_obj) -> Optional[str]:
+        """
+        Extract text from an open DOCX file object without copying it to bytes
+        
+        Args:
+            file_obj: Binary file object positioned at the start of the DOCX
+            
+        Returns:
+            Extracted text or None if failed
+        """
+        try:
+            doc = Document(file_obj)
+            text = ""
+            
+            for paragraph in doc.paragraphs:
+                text += paragraph.text + "\n"
+            
+            return text.strip()
+            
+        except Exception as e:
+            self.logger.error(f"Error reading DOCX stream: {e}")
+            return None
+    
     def read_txt(self, file_path: str, encoding: str = 'utf-8') -> Optional[str]:
         """
         Read text from TXT file
@@ -191,8 +247,8 @@ class DocumentProcessor:
         elif file_type == 'txt':
             try:
                 return file_bytes.decode('utf-8')
-            except:
-                return file_bytes.decode('latin-1')
+            except UnicodeDecodeError:
+                return file_bytes.decode('utf-8', errors='replace')
         else:
             self.logger.error(f"Unsupported file type: {file_type}")
             return None
@@ -212,6 +268,11 @@ class DocumentProcessor:
         if not text:
             return []
         
+        # ASCII text (the common case for extracted documents) can use the
+        # fast path where byte offsets equal character offsets
+        if text.isascii():
+            return self._chunk_text_ascii(text, chunk_size, overlap)
+        
         chunks = []
         start = 0
         
@@ -235,6 +296,42 @@ class DocumentProcessor:
         
         return chunks
     
+    def _chunk_text_ascii(self, text: str, chunk_size: int, overlap: int) -> List[str]:
+        """
+        Chunk ASCII text using precomputed whitespace indices
+        
+        All space positions are found in one vectorized pass, then each
+        window boundary is snapped to the nearest prior space with a
+        binary search instead of a per-chunk rfind scan. The loop works
+        on the encoded bytes (one slice+strip per chunk) and decodes
+        each chunk exactly once at the end.
+        """
+        buf = text.encode('ascii')
+        space_idx = np.nonzero(np.frombuffer(buf, dtype=np.uint8) == 0x20)[0]
+        
+        raw_chunks = []
+        start = 0
+        text_length = len(buf)
+        
+        while start < text_length:
+            end = start + chunk_size
+            
+            if end < text_length:
+                # Snap to the last space before the chunk_size limit
+                pos = np.searchsorted(space_idx, end, side='left') - 1
+                if pos >= 0 and space_idx[pos] > start:
+                    end = int(space_idx[pos])
+            
+            chunk = buf[start:end].strip()
+            if chunk:
+                raw_chunks.append(chunk)
+            
+            start = end - overlap
+            if start < 0:
+                start = 0
+        
+        return [chunk.decode('ascii') for chunk in raw_chunks]
+    
     def extract_metadata(self, file_path: str) -> Dict:
         """
         Extract metadata from document
@@ -256,24 +353,21 @@ class DocumentProcessor:
         }
         
         try:
-            # Basic file info
-            metadata['file_size'] = os.path.getsize(file_path)
-            metadata['file_type'] = os.path.splitext(file_path)[1].lower()
+            # Basic file info from a single stat call
+            file_type = os.path.splitext(file_path)[1].lower()
+            metadata['file_size'] = os.stat(file_path).st_size
+            metadata['file_type'] = file_type
             
-            # Extract text to count words/characters
-            text = self.read_document(file_path)
+            # Read the file once and work on the in-memory bytes from here on
+            with open(file_path, 'rb') as file:
+                file_bytes = file.read()
+            
+            # Single parse yields both text and page count
+            text, page_count = self._parse_once(file_bytes, file_type)
             if text:
                 metadata['character_count'] = len(text)
                 metadata['word_count'] = len(text.split())
-            
-            # Try to get page count for PDF
-            if metadata['file_type'] == '.pdf':
-                try:
-                    with open(file_path, 'rb') as file:
-                        pdf_reader = PyPDF2.PdfReader(file)
-                        metadata['page_count'] = len(pdf_reader.pages)
-                except:
-                    pass
+            metadata['page_count'] = page_count
             
             return metadata
             
@@ -281,6 +375,36 @@ class DocumentProcessor:
             self.logger.error(f"Error extracting metadata from {file_path}: {e}")
             return metadata
     
+    def _parse_once(self, file_bytes: bytes, file_type: str) -> Tuple[Optional[str], int]:
+        """
+        Extract text and page count from document bytes in one parse
+        
+        Args:
+            file_bytes: Document as bytes
+            file_type: File extension including the dot
+            
+        Returns:
+            Tuple of (extracted text or None, page count)
+        """
+        if file_type == '.pdf':
+            try:
+                pdf_file = io.BytesIO(file_bytes)
+                
+                if PDFIUM_AVAILABLE:
+                    pdf = pdfium.PdfDocument(pdf_file)
+                    pages_text = [page.get_textpage().get_text_range() for page in pdf]
+                else:
+                    pdf_reader = PyPDF2.PdfReader(pdf_file)
+                    pages_text = [page.extract_text() for page in pdf_reader.pages]
+                
+                return "\n".join(pages_text).strip(), len(pages_text)
+                
+            except Exception as e:
+                self.logger.error(f"Error parsing PDF bytes: {e}")
+                return None, 0
+        
+        return self.read_document_from_bytes(file_bytes, file_type.lstrip('.')), 0
+    
     def is_supported_format(self, file_path: str) -> bool:
         """
         Check if file format is supported
@@ -301,4 +425,4 @@ class DocumentProcessor:
         Returns:
             List of supported file extensions
         """
-        return self.supported_formats.copy()
+        return sorted(self.supported_formats)
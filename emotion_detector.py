@@ -3,8 +3,28 @@ Emotion detection utilities for EmotiBot
 """
 from textblob import TextBlob
 import re
+import threading
+from collections import Counter, OrderedDict
 from typing import Dict, List, Tuple
 
+# Prefer the C-backed Aho-Corasick automaton when available; fall back to
+# the compiled regex alternation
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except Exception:
+    AHOCORASICK_AVAILABLE = False
+    ahocorasick = None
+
+# Prefer VADER's compiled lexicon for sentiment on short chat messages;
+# fall back to TextBlob (which lazily loads NLTK data per process)
+try:
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    VADER_AVAILABLE = True
+except Exception:
+    VADER_AVAILABLE = False
+    SentimentIntensityAnalyzer = None
+
 class EmotionDetector:
     def __init__(self):
         self.emotion_keywords = {
@@ -15,12 +35,45 @@ class EmotionDetector:
             'surprise': ['surprised', 'shocked', 'amazed', 'astonished', 'stunned'],
             'disgust': ['disgusted', 'revolted', 'sick', 'nauseated', 'repulsed']
         }
+        
+        # Precompute keyword -> emotion lookup and a single alternation pattern
+        # so detection is one pass over the text instead of one scan per keyword
+        self._keyword_to_emotion = {
+            keyword: emotion
+            for emotion, keywords in self.emotion_keywords.items()
+            for keyword in keywords
+        }
+        self._keyword_pattern = re.compile(
+            r'\b(' + '|'.join(map(re.escape, self._keyword_to_emotion)) + r')\b'
+        )
+        
+        self._vader = SentimentIntensityAnalyzer() if VADER_AVAILABLE else None
+        
+        # Small LRU over full analyses so repeated texts (retries, dev
+        # loops, duplicate turns) skip both model calls. Locked: the
+        # detector is shared across sessions and their worker threads.
+        self._analysis_cache = OrderedDict()
+        self._analysis_cache_size = 256
+        self._analysis_cache_lock = threading.Lock()
+        
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for keyword, emotion in self._keyword_to_emotion.items():
+                automaton.add_word(keyword, (keyword, emotion))
+            automaton.make_automaton()
+            self._automaton = automaton
     
     def analyze_sentiment(self, text: str) -> Dict[str, float]:
-        """Analyze sentiment using TextBlob"""
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity  # -1 to 1
-        subjectivity = blob.sentiment.subjectivity  # 0 to 1
+        """Analyze sentiment using VADER when available, else TextBlob"""
+        if self._vader is not None:
+            scores = self._vader.polarity_scores(text)
+            polarity = scores['compound']  # -1 to 1
+            subjectivity = 1 - scores['neu']  # 0 to 1
+        else:
+            blob = TextBlob(text)
+            polarity = blob.sentiment.polarity  # -1 to 1
+            subjectivity = blob.sentiment.subjectivity  # 0 to 1
         
         return {
             'polarity': polarity,
@@ -31,22 +84,36 @@ class EmotionDetector:
     def detect_emotions(self, text: str) -> Dict[str, float]:
         """Detect emotions based on keyword matching"""
         text_lower = text.lower()
-        emotion_scores = {}
         
-        for emotion, keywords in self.emotion_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in text_lower:
-                    score += 1
-            
-            # Normalize score
-            emotion_scores[emotion] = score / len(keywords) if keywords else 0
+        counts = Counter()
+        if self._automaton is not None:
+            for end, (keyword, emotion) in self._automaton.iter(text_lower):
+                if self._is_word_match(text_lower, end - len(keyword) + 1, end):
+                    counts[emotion] += 1
+        else:
+            for match in self._keyword_pattern.finditer(text_lower):
+                counts[self._keyword_to_emotion[match.group(1)]] += 1
         
-        return emotion_scores
+        # Normalize scores, clamped to [0, 1]: occurrence counts can
+        # exceed the keyword count when a word repeats
+        return {
+            emotion: min(counts[emotion] / len(keywords), 1.0) if keywords else 0
+            for emotion, keywords in self.emotion_keywords.items()
+        }
     
-    def get_dominant_emotion(self, text: str) -> Tuple[str, float]:
-        """Get the dominant emotion from text"""
-        emotions = self.detect_emotions(text)
+    @staticmethod
+    def _is_word_match(text: str, start: int, end: int) -> bool:
+        """Check that a substring match falls on word boundaries"""
+        if start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+            return False
+        if end + 1 < len(text) and (text[end + 1].isalnum() or text[end + 1] == '_'):
+            return False
+        return True
+    
+    def get_dominant_emotion(self, text: str, emotions: Dict[str, float] = None) -> Tuple[str, float]:
+        """Get the dominant emotion from text, reusing precomputed scores if given"""
+        if emotions is None:
+            emotions = self.detect_emotions(text)
         
         if not emotions:
             return 'neutral', 0.0
@@ -57,12 +124,18 @@ class EmotionDetector:
         return dominant_emotion, confidence
     
     def analyze_text(self, text: str) -> Dict:
-        """Complete emotion analysis of text"""
+        """Complete emotion analysis of text, memoized per unique text"""
+        with self._analysis_cache_lock:
+            cached = self._analysis_cache.get(text)
+            if cached is not None:
+                self._analysis_cache.move_to_end(text)
+                return cached
+        
         sentiment = self.analyze_sentiment(text)
         emotions = self.detect_emotions(text)
-        dominant_emotion, confidence = self.get_dominant_emotion(text)
+        dominant_emotion, confidence = self.get_dominant_emotion(text, emotions)
         
-        return {
+        analysis = {
             'text': text,
             'sentiment': sentiment,
             'emotions': emotions,
@@ -71,3 +144,10 @@ class EmotionDetector:
             'text_length': len(text),
             'word_count': len(text.split())
         }
+        
+        with self._analysis_cache_lock:
+            self._analysis_cache[text] = analysis
+            if len(self._analysis_cache) > self._analysis_cache_size:
+                self._analysis_cache.popitem(last=False)
+        
+        return analysis
@@ -8,13 +8,51 @@ import google.generativeai as genai
 from sentence_transformers import SentenceTransformer
 import numpy as np
 from typing import List, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import sqlite3
+import threading
 import uuid
-import json
 import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 import logging
 from document_processor import DocumentProcessor
-from config import Config
+from config import get_settings
+from utils import ResponseCache
+
+# Settings are loaded once at import time; hot paths read a local module alias
+_SETTINGS = get_settings()
+
+# Shared pools for synchronous bulk ingestion, created on first use:
+# parsing spreads across CPU cores while the single-worker embed pool keeps
+# the encoder (and any GPU behind it) fed serially for locality
+_PARSE_POOL = None
+_EMBED_POOL = None
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _PARSE_POOL
+    if _PARSE_POOL is None:
+        _PARSE_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _PARSE_POOL
+
+def _get_embed_pool() -> ThreadPoolExecutor:
+    global _EMBED_POOL
+    if _EMBED_POOL is None:
+        _EMBED_POOL = ThreadPoolExecutor(max_workers=1)
+    return _EMBED_POOL
+
+def _parse_file(file_path: str) -> Optional[str]:
+    """Parse one document in a worker process"""
+    return DocumentProcessor().read_document(file_path)
+
+_COLLECTION_METADATA = {
+    "description": "EmotiBot conversation memory and documents",
+    # Embeddings are normalized at encode time, so inner product is
+    # cosine similarity without the L2 sqrt
+    "hnsw:space": "ip"
+}
 
 class RAGSystem:
     def __init__(self, persist_directory: str = "./chroma_db"):
@@ -24,9 +62,22 @@ class RAGSystem:
         # Initialize components
         self.doc_processor = DocumentProcessor()
         self.embedding_model = None
+        self.gemini_model = None
         self.chroma_client = None
         self.collection = None
         
+        # Small LRU cache so repeated texts (retried queries, the query
+        # re-embedded when storing the conversation) skip the model forward.
+        # Locked: the instance is a process-wide singleton reached from
+        # several sessions' pool threads at once.
+        self._embedding_cache = OrderedDict()
+        self._embedding_cache_size = 256
+        self._embedding_cache_lock = threading.Lock()
+        
+        # Exact-match response cache: repeated identical prompts skip the
+        # LLM call entirely
+        self.response_cache = ResponseCache()
+        
         # Initialize the system
         self.initialize_system()
     
@@ -36,6 +87,10 @@ class RAGSystem:
             # Initialize embedding model
             self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
             self.logger.info("Embedding model loaded successfully")
+
+            # Configure Gemini once and keep a single model handle around
+            genai.configure(api_key=_SETTINGS.google_api_key)
+            self.gemini_model = genai.GenerativeModel(_SETTINGS.google_model)
             
             # Initialize ChromaDB
             self.chroma_client = chromadb.PersistentClient(
@@ -45,34 +100,159 @@ class RAGSystem:
             
             # Get or create collection
             self.collection = self.chroma_client.get_or_create_collection(
-                name=Config.COLLECTION_NAME,
-                metadata={"description": "EmotiBot conversation memory and documents"}
+                name=_SETTINGS.collection_name,
+                metadata=_COLLECTION_METADATA
             )
             
+            # get_or_create only applies the metadata when the collection
+            # is new: one persisted before the switch to inner product is
+            # still an L2 index over unnormalized vectors, and treating
+            # its distances as cosine silently corrupts similarity scores.
+            # Leave such a collection untouched and move to a versioned
+            # name that really is inner product.
+            space = (self.collection.metadata or {}).get('hnsw:space', 'l2')
+            if space != 'ip':
+                versioned_name = f"{_SETTINGS.collection_name}_ip"
+                self.logger.warning(
+                    f"Collection '{_SETTINGS.collection_name}' uses '{space}' distance; "
+                    f"switching to '{versioned_name}'"
+                )
+                self.collection = self.chroma_client.get_or_create_collection(
+                    name=versioned_name,
+                    metadata=_COLLECTION_METADATA
+                )
+            
+            # Per-chunk embedding cache on disk: re-uploading a document
+            # the model has already seen becomes a lookup, not an encode
+            self._chunk_cache = None
+            self._chunk_cache_lock = threading.Lock()
+            try:
+                self._chunk_cache = sqlite3.connect(
+                    os.path.join(self.persist_directory, 'embedding_cache.db'),
+                    check_same_thread=False
+                )
+                self._chunk_cache.execute(
+                    'CREATE TABLE IF NOT EXISTS chunk_embeddings (key TEXT PRIMARY KEY, embedding BLOB)'
+                )
+                self._chunk_cache.commit()
+            except Exception as e:
+                self.logger.warning(f"Chunk embedding cache unavailable: {e}")
+                self._chunk_cache = None
+            
             self.logger.info("RAG system initialized successfully")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize RAG system: {e}")
             raise
     
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    def generate_embeddings(self, texts: List[str], batch_size: int = 64) -> Optional[np.ndarray]:
         """
         Generate embeddings for a list of texts
-        
+
         Args:
             texts: List of text strings
-            
+            batch_size: Batch size passed to the encoder
+
         Returns:
-            List of embedding vectors
+            Array of embedding vectors or None if failed
         """
         try:
-            embeddings = self.embedding_model.encode(texts)
-            return embeddings.tolist()
+            embeddings = self.embedding_model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            # Chroma accepts float32 arrays directly; keep the dtype stable
+            # so no per-value boxing happens on either side
+            return np.asarray(embeddings, dtype=np.float32)
         except Exception as e:
             self.logger.error(f"Error generating embeddings: {e}")
-            return []
+            return None
+    
+    def _embed_one(self, text: str) -> Optional[np.ndarray]:
+        """
+        Embed a single text with an LRU cache in front of the model
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector or None if failed
+        """
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        
+        with self._embedding_cache_lock:
+            cached = self._embedding_cache.get(key)
+            if cached is not None:
+                self._embedding_cache.move_to_end(key)
+                return cached
+        
+        embeddings = self.generate_embeddings([text])
+        if embeddings is None or len(embeddings) == 0:
+            return None
+        
+        embedding = embeddings[0]
+        with self._embedding_cache_lock:
+            self._embedding_cache[key] = embedding
+            if len(self._embedding_cache) > self._embedding_cache_size:
+                self._embedding_cache.popitem(last=False)
+        
+        return embedding
+    
+    def _embed_chunks_cached(self, chunks: List[str], batch_size: int = 64) -> Optional[np.ndarray]:
+        """
+        Embed chunks, reusing persisted vectors for previously seen text
+        
+        Each chunk is keyed by a hash of its text; only chunks missing
+        from the on-disk cache go through the encoder, in one batched
+        call, and their vectors are persisted for the next upload.
+        
+        Args:
+            chunks: Text chunks to embed
+            batch_size: Embedding batch size for uncached chunks
+            
+        Returns:
+            Array of embedding vectors or None if failed
+        """
+        if self._chunk_cache is None:
+            return self.generate_embeddings(chunks, batch_size=batch_size)
+        
+        keys = [
+            hashlib.blake2b(chunk.encode('utf-8'), digest_size=16).hexdigest()
+            for chunk in chunks
+        ]
+        embeddings = [None] * len(chunks)
+        missing = []
+        
+        with self._chunk_cache_lock:
+            for i, key in enumerate(keys):
+                row = self._chunk_cache.execute(
+                    'SELECT embedding FROM chunk_embeddings WHERE key = ?', (key,)
+                ).fetchone()
+                if row:
+                    embeddings[i] = np.frombuffer(row[0], dtype=np.float32)
+                else:
+                    missing.append(i)
+        
+        if missing:
+            fresh = self.generate_embeddings([chunks[i] for i in missing], batch_size=batch_size)
+            if fresh is None or len(fresh) == 0:
+                return None
+            
+            with self._chunk_cache_lock:
+                for i, vector in zip(missing, fresh):
+                    embeddings[i] = vector
+                    self._chunk_cache.execute(
+                        'INSERT OR REPLACE INTO chunk_embeddings (key, embedding) VALUES (?, ?)',
+                        (keys[i], vector.tobytes())
+                    )
+                self._chunk_cache.commit()
+        
+        return np.vstack(embeddings)
     
-    def add_document(self, text: str, metadata: Dict = None, chunk_size: int = 1000) -> bool:
+    def add_document(self, text: str, metadata: Dict = None, chunk_size: int = 1000, batch_size: int = 64) -> bool:
         """
         Add a document to the knowledge base
         
@@ -80,6 +260,7 @@ class RAGSystem:
             text: Document text
             metadata: Optional metadata dict
             chunk_size: Size of text chunks
+            batch_size: Embedding batch size
             
         Returns:
             True if successful, False otherwise
@@ -92,32 +273,31 @@ class RAGSystem:
                 self.logger.warning("No chunks generated from document")
                 return False
             
-            # Generate IDs for chunks
-            chunk_ids = [str(uuid.uuid4()) for _ in chunks]
+            # Generate IDs for chunks: one CSPRNG draw per document, not
+            # one per chunk - ids stay globally unique via the base uuid
+            base_id = uuid.uuid4().hex
+            chunk_ids = [f"{base_id}-{i}" for i in range(len(chunks))]
             
-            # Generate embeddings
-            embeddings = self.generate_embeddings(chunks)
+            # Generate embeddings, reusing any persisted per-chunk vectors
+            embeddings = self._embed_chunks_cached(chunks, batch_size=batch_size)
             
-            if not embeddings:
+            if embeddings is None or len(embeddings) == 0:
                 self.logger.error("Failed to generate embeddings for document")
                 return False
             
-            # Prepare metadata for each chunk
-            chunk_metadata = []
-            for i, chunk_id in enumerate(chunk_ids):
-                chunk_meta = {
-                    'chunk_id': chunk_id,
-                    'chunk_index': i,
-                    'total_chunks': len(chunks),
-                    'timestamp': datetime.now().isoformat(),
-                    'type': 'document'
-                }
-                
-                # Add user metadata if provided
-                if metadata:
-                    chunk_meta.update(metadata)
-                
-                chunk_metadata.append(chunk_meta)
+            # Prepare metadata for each chunk: shared fields (including one
+            # consistent timestamp and any user metadata) are built once and
+            # only the per-chunk keys vary
+            base_meta = {
+                'total_chunks': len(chunks),
+                'timestamp': datetime.now().isoformat(),
+                'type': 'document',
+                **(metadata or {})
+            }
+            chunk_metadata = [
+                {**base_meta, 'chunk_id': chunk_id, 'chunk_index': i}
+                for i, chunk_id in enumerate(chunk_ids)
+            ]
             
             # Add to ChromaDB
             self.collection.add(
@@ -150,10 +330,11 @@ class RAGSystem:
             # Create conversation text
             conversation_text = f"User: {user_message}\nEmotiBot: {bot_response}"
             
-            # Generate embedding
-            embeddings = self.generate_embeddings([conversation_text])
+            # Embed the user side only: it is what retrieval queries match
+            # against, and it is already cached from the search pass
+            embedding = self._embed_one(user_message)
             
-            if not embeddings:
+            if embedding is None:
                 return False
             
             # Prepare metadata
@@ -165,13 +346,20 @@ class RAGSystem:
             }
             
             if emotions:
-                metadata['emotions'] = json.dumps(emotions)
+                # Flatten to scalar fields so Chroma can filter on them
+                # directly, e.g. where={'dominant_emotion': 'joy'}
+                dominant_emotion = emotions.get('dominant_emotion')
+                if dominant_emotion:
+                    metadata['dominant_emotion'] = dominant_emotion
+                metadata['confidence'] = float(emotions.get('confidence', 0.0))
+                sentiment = emotions.get('sentiment') or {}
+                metadata['polarity'] = float(sentiment.get('polarity', 0.0))
             
             # Add to ChromaDB
             conversation_id = str(uuid.uuid4())
             self.collection.add(
                 documents=[conversation_text],
-                embeddings=embeddings,
+                embeddings=[embedding],
                 metadatas=[metadata],
                 ids=[conversation_id]
             )
@@ -195,15 +383,15 @@ class RAGSystem:
             List of search results
         """
         try:
-            # Generate query embedding
-            query_embeddings = self.generate_embeddings([query])
+            # Generate query embedding (cached for repeated queries)
+            query_embedding = self._embed_one(query)
             
-            if not query_embeddings:
+            if query_embedding is None:
                 return []
             
             # Search in ChromaDB
             results = self.collection.query(
-                query_embeddings=query_embeddings,
+                query_embeddings=[query_embedding],
                 n_results=n_results,
                 where=filter_dict
             )
@@ -225,20 +413,24 @@ class RAGSystem:
             self.logger.error(f"Error searching knowledge base: {e}")
             return []
     
-    def get_relevant_context(self, user_message: str, max_context_length: int = 2000) -> str:
+    def get_relevant_context(self, user_message: str, max_context_length: int = 2000,
+                             results: List[Dict] = None) -> str:
         """
         Get relevant context for generating a response
         
         Args:
             user_message: User's message
             max_context_length: Maximum length of context
+            results: Optional precomputed search results to reuse
             
         Returns:
             Relevant context string
         """
         try:
-            # Search for relevant documents and conversations
-            results = self.search_similar(user_message, n_results=5)
+            # Search for relevant documents and conversations unless the
+            # caller already retrieved them
+            if results is None:
+                results = self.search_similar(user_message, n_results=5)
             
             context_parts = []
             current_length = 0
@@ -247,19 +439,20 @@ class RAGSystem:
                 document = result['document']
                 metadata = result['metadata']
                 
-                # Add context with source information
+                # Add context with source information; the join below
+                # supplies the separator, so fragments carry no newline
                 if metadata.get('type') == 'conversation':
-                    context_part = f"Previous conversation: {document}\n"
+                    context_part = f"Previous conversation: {document}"
                 else:
-                    source = metadata.get('source', 'Unknown')
-                    context_part = f"From {source}: {document}\n"
+                    context_part = f"From {metadata.get('source', 'Unknown')}: {document}"
                 
-                # Check if adding this context would exceed the limit
-                if current_length + len(context_part) > max_context_length:
+                # Budget includes the separator so the limit is exact
+                added_length = len(context_part) + (1 if context_parts else 0)
+                if current_length + added_length > max_context_length:
                     break
                 
                 context_parts.append(context_part)
-                current_length += len(context_part)
+                current_length += added_length
             
             return "\n".join(context_parts)
             
@@ -267,53 +460,113 @@ class RAGSystem:
             self.logger.error(f"Error getting relevant context: {e}")
             return ""
     
-    def generate_response(self, user_message: str, emotions: Dict = None) -> str:
+    def _build_prompt(self, user_message: str, context: str, emotions: Dict = None) -> str:
+        """Build the emotion-aware RAG prompt"""
+        emotion_info = ""
+        if emotions:
+            dominant_emotion = emotions.get('dominant_emotion', 'neutral')
+            confidence = emotions.get('confidence', 0)
+            emotion_info = f"The user seems to be feeling {dominant_emotion} (confidence: {confidence:.2f}). "
+        
+        return f"""You are EmotiBot, an empathetic AI companion. {emotion_info}Respond compassionately to the user's message.
+
+Relevant context:
+{context}
+
+User message: {user_message}
+
+Please provide a helpful, empathetic response:"""
+    
+    def generate_response(self, user_message: str, emotions: Dict = None,
+                          hits: List[Dict] = None) -> str:
         """
         Generate a response using RAG
         
         Args:
             user_message: User's message
             emotions: Detected emotions
+            hits: Optional precomputed search results, skipping retrieval
             
         Returns:
             Generated response
         """
         try:
-            # Get relevant context
-            context = self.get_relevant_context(user_message)
+            dominant_emotion = (emotions or {}).get('dominant_emotion', '')
+            cache_key = ResponseCache.make_key(user_message, dominant_emotion)
             
-            # Prepare the prompt
-            emotion_info = ""
-            if emotions:
-                dominant_emotion = emotions.get('dominant_emotion', 'neutral')
-                confidence = emotions.get('confidence', 0)
-                emotion_info = f"The user seems to be feeling {dominant_emotion} (confidence: {confidence:.2f}). "
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
             
-            prompt = f"""You are EmotiBot, an empathetic AI companion. {emotion_info}Respond compassionately to the user's message.
-
-Relevant context:
-{context}
-
-User message: {user_message}
-
-Please provide a helpful, empathetic response:"""
-            
-            # Generate response using Gemini
-            genai.configure(api_key=Config.GOOGLE_API_KEY)
-            model = genai.GenerativeModel('gemini-pro')
+            # Get relevant context
+            context = self.get_relevant_context(user_message, results=hits)
             
-            response = model.generate_content(prompt)
+            # Generate response using the cached Gemini model
+            response = self.gemini_model.generate_content(
+                self._build_prompt(user_message, context, emotions)
+            )
             bot_response = response.text
             
             # Add this conversation to memory
             self.add_conversation(user_message, bot_response, emotions)
             
+            self.response_cache.put(cache_key, bot_response)
             return bot_response
             
         except Exception as e:
             self.logger.error(f"Error generating response: {e}")
             return "I'm sorry, I'm having trouble generating a response right now. Please try again."
     
+    def generate_response_stream(self, user_message: str, emotions: Dict = None,
+                                 hits: List[Dict] = None):
+        """
+        Generate a response using RAG, yielding text chunks as they arrive
+        
+        Streaming counterpart to generate_response: the caller sees the
+        first tokens while the rest of the answer is still generating. The
+        full text is stored in conversation memory and the response cache
+        once the stream completes.
+        
+        Args:
+            user_message: User's message
+            emotions: Detected emotions
+            hits: Optional precomputed search results, skipping retrieval
+            
+        Yields:
+            Response text chunks
+        """
+        try:
+            dominant_emotion = (emotions or {}).get('dominant_emotion', '')
+            cache_key = ResponseCache.make_key(user_message, dominant_emotion)
+            
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+            
+            # Get relevant context
+            context = self.get_relevant_context(user_message, results=hits)
+            
+            response = self.gemini_model.generate_content(
+                self._build_prompt(user_message, context, emotions),
+                stream=True
+            )
+            
+            parts = []
+            for chunk in response:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+            
+            if parts:
+                bot_response = ''.join(parts)
+                self.add_conversation(user_message, bot_response, emotions)
+                self.response_cache.put(cache_key, bot_response)
+            
+        except Exception as e:
+            self.logger.error(f"Error generating streamed response: {e}")
+            yield "I'm sorry, I'm having trouble generating a response right now. Please try again."
+    
     def add_document_file(self, file_path: str, metadata: Dict = None) -> bool:
         """
         Add a document file to the knowledge base
@@ -349,7 +602,186 @@ Please provide a helpful, empathetic response:"""
         except Exception as e:
             self.logger.error(f"Error adding document file {file_path}: {e}")
             return False
-    
+
+    async def add_document_files(self, file_paths: List[str], max_concurrency: int = 8,
+                                 chunk_size: int = 1000, batch_size: int = 128) -> Dict[str, bool]:
+        """
+        Add multiple document files to the knowledge base concurrently
+
+        Files are parsed in parallel worker threads, then all chunks across
+        all documents are embedded in a single batched encode call and
+        inserted with one collection add.
+
+        Args:
+            file_paths: Paths to document files
+            max_concurrency: Maximum number of files parsed at once
+            chunk_size: Size of text chunks
+            batch_size: Embedding batch size
+
+        Returns:
+            Mapping of file path to success flag
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _parse(path: str) -> Optional[str]:
+            async with semaphore:
+                return await asyncio.to_thread(self.doc_processor.read_document, path)
+
+        texts = await asyncio.gather(*(_parse(path) for path in file_paths))
+
+        results = {}
+        all_chunks = []
+        all_ids = []
+        all_metadata = []
+
+        for file_path, text in zip(file_paths, texts):
+            if not text:
+                self.logger.error(f"Could not extract text from {file_path}")
+                results[file_path] = False
+                continue
+
+            chunks = self.doc_processor.chunk_text(text, chunk_size=chunk_size)
+            if not chunks:
+                self.logger.warning(f"No chunks generated from {file_path}")
+                results[file_path] = False
+                continue
+
+            timestamp = datetime.now().isoformat()
+            base_id = uuid.uuid4().hex
+            for i, chunk in enumerate(chunks):
+                chunk_id = f"{base_id}-{i}"
+                all_chunks.append(chunk)
+                all_ids.append(chunk_id)
+                all_metadata.append({
+                    'chunk_id': chunk_id,
+                    'chunk_index': i,
+                    'total_chunks': len(chunks),
+                    'timestamp': timestamp,
+                    'type': 'document',
+                    'source': os.path.basename(file_path),
+                    'file_path': file_path,
+                    'file_type': os.path.splitext(file_path)[1]
+                })
+
+            results[file_path] = True
+
+        if not all_chunks:
+            return results
+
+        try:
+            embeddings = await asyncio.to_thread(
+                self.generate_embeddings, all_chunks, batch_size
+            )
+
+            if embeddings is None or len(embeddings) == 0:
+                self.logger.error("Failed to generate embeddings for document batch")
+                return {path: False for path in file_paths}
+
+            self.collection.add(
+                documents=all_chunks,
+                embeddings=embeddings,
+                metadatas=all_metadata,
+                ids=all_ids
+            )
+
+            self.logger.info(f"Added {len(all_chunks)} chunks from {len(file_paths)} files to knowledge base")
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error adding document batch: {e}")
+            return {path: False for path in file_paths}
+
+    def ingest_files(self, file_paths: List[str], chunk_size: int = 1000,
+                     batch_size: int = 128) -> Dict[str, bool]:
+        """
+        Add multiple document files using the shared worker pools
+
+        Blocking counterpart to add_document_files: files are parsed in the
+        process pool, chunks across all documents are embedded through the
+        single-worker embed pool, and everything lands in one collection add.
+
+        Args:
+            file_paths: Paths to document files
+            chunk_size: Size of text chunks
+            batch_size: Embedding batch size
+
+        Returns:
+            Mapping of file path to success flag
+        """
+        parse_futures = {
+            path: _get_parse_pool().submit(_parse_file, path)
+            for path in file_paths
+        }
+
+        results = {}
+        all_chunks = []
+        all_ids = []
+        all_metadata = []
+
+        for file_path, future in parse_futures.items():
+            try:
+                text = future.result()
+            except Exception as e:
+                self.logger.error(f"Error parsing {file_path}: {e}")
+                results[file_path] = False
+                continue
+
+            if not text:
+                self.logger.error(f"Could not extract text from {file_path}")
+                results[file_path] = False
+                continue
+
+            chunks = self.doc_processor.chunk_text(text, chunk_size=chunk_size)
+            if not chunks:
+                self.logger.warning(f"No chunks generated from {file_path}")
+                results[file_path] = False
+                continue
+
+            timestamp = datetime.now().isoformat()
+            base_id = uuid.uuid4().hex
+            for i, chunk in enumerate(chunks):
+                chunk_id = f"{base_id}-{i}"
+                all_chunks.append(chunk)
+                all_ids.append(chunk_id)
+                all_metadata.append({
+                    'chunk_id': chunk_id,
+                    'chunk_index': i,
+                    'total_chunks': len(chunks),
+                    'timestamp': timestamp,
+                    'type': 'document',
+                    'source': os.path.basename(file_path),
+                    'file_path': file_path,
+                    'file_type': os.path.splitext(file_path)[1]
+                })
+
+            results[file_path] = True
+
+        if not all_chunks:
+            return results
+
+        try:
+            embeddings = _get_embed_pool().submit(
+                self.generate_embeddings, all_chunks, batch_size
+            ).result()
+
+            if embeddings is None or len(embeddings) == 0:
+                self.logger.error("Failed to generate embeddings for document batch")
+                return {path: False for path in file_paths}
+
+            self.collection.add(
+                documents=all_chunks,
+                embeddings=embeddings,
+                metadatas=all_metadata,
+                ids=all_ids
+            )
+
+            self.logger.info(f"Added {len(all_chunks)} chunks from {len(file_paths)} files to knowledge base")
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error adding document batch: {e}")
+            return {path: False for path in file_paths}
+
     def get_collection_stats(self) -> Dict:
         """
         Get statistics about the knowledge base
@@ -376,7 +808,7 @@ Please provide a helpful, empathetic response:"""
                 'total_items': count,
                 'document_chunks': doc_count,
                 'conversations': conversation_count,
-                'collection_name': Config.COLLECTION_NAME
+                'collection_name': _SETTINGS.collection_name
             }
             
         except Exception as e:
@@ -391,13 +823,14 @@ Please provide a helpful, empathetic response:"""
             True if successful, False otherwise
         """
         try:
-            # Delete the collection
-            self.chroma_client.delete_collection(Config.COLLECTION_NAME)
+            # Delete whichever collection is active (the configured name,
+            # or its versioned successor) and recreate it
+            name = self.collection.name
+            self.chroma_client.delete_collection(name)
             
-            # Recreate the collection
             self.collection = self.chroma_client.get_or_create_collection(
-                name=Config.COLLECTION_NAME,
-                metadata={"description": "EmotiBot conversation memory and documents"}
+                name=name,
+                metadata=_COLLECTION_METADATA
             )
             
             self.logger.info("Collection cleared successfully")
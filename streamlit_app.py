@@ -1,106 +1,164 @@
 import streamlit as st
 import os
 import io
+import json
+import shutil
 import tempfile
-from dotenv import load_dotenv
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import dotenv_values
 import google.generativeai as genai
 import time
 import threading
 
-# Try to import modules with fallbacks
-try:
-    from emotion_detector import EmotionDetector
-    EMOTION_AVAILABLE = True
-except Exception as e:
-    st.warning(f"Emotion detection not available: {e}")
-    EMOTION_AVAILABLE = False
-    EmotionDetector = None
-
-try:
-    from speech_processor import SpeechProcessor
-    SPEECH_AVAILABLE = True
-except Exception as e:
-    st.warning(f"Speech processing not available: {e}")
-    SPEECH_AVAILABLE = False
-    SpeechProcessor = None
-
-try:
-    from document_processor import DocumentProcessor
-    DOCUMENT_AVAILABLE = True
-except Exception as e:
-    st.warning(f"Document processing not available: {e}")
-    DOCUMENT_AVAILABLE = False
-    DocumentProcessor = None
-
-# Try to import RAG system, but make it optional
-try:
-    from rag_system import RAGSystem
-    RAG_AVAILABLE = True
-except Exception as e:
-    st.warning(f"RAG system not available: {e}")
-    RAG_AVAILABLE = False
-    RAGSystem = None
-
-# Load environment variables
-load_dotenv()
+from utils import ResponseCache, SemanticCache, PersistentSemanticCache, similarities_batch
+
+# Background pool for document indexing so uploads return immediately.
+# cache_resource keeps one pool per process; a module global would leak a
+# fresh executor (and its threads) on every Streamlit rerun.
+@st.cache_resource
+def _get_index_pool():
+    return ThreadPoolExecutor(max_workers=2)
+
+# Background pool for voice capture so listening never blocks the worker;
+# one per process, not one per rerun
+@st.cache_resource
+def _get_voice_pool():
+    return ThreadPoolExecutor(max_workers=2)
+
+# Pool for running emotion analysis and retrieval side by side per
+# message; one per process, not one per rerun
+@st.cache_resource
+def _get_analysis_pool():
+    return ThreadPoolExecutor(max_workers=2)
+
+# Exact-match cache for fallback LLM responses keyed by message + emotion,
+# held in cache_resource so it survives Streamlit reruns
+@st.cache_resource
+def _get_response_cache():
+    return ResponseCache()
+
+# Near-duplicate cache keyed by message embedding, so paraphrased repeats
+# skip retrieval and generation entirely. Held in cache_resource because
+# module globals are reborn on every Streamlit rerun.
+@st.cache_resource
+def _get_semantic_cache():
+    return SemanticCache()
+
+# Disk-backed layer behind the in-memory semantic cache: hits survive
+# server restarts. One connection (and one brute-force matrix) per
+# process, not per rerun.
+@st.cache_resource
+def _get_persistent_cache():
+    try:
+        return PersistentSemanticCache('cache.db')
+    except Exception:
+        return None
+
+# Static UI strings and layout constants, built once at import instead of
+# reallocated on every Streamlit rerun
+_PAGE_CFG = dict(
+    page_title="EmotiBot - AI Emotional Companion",
+    page_icon="🤖",
+    layout="wide"
+)
+_WELCOME_MD = "Welcome to EmotiBot! Your AI-powered emotional conversation companion with speech and document processing capabilities."
+_MODES = ["💬 Text Chat", "🎤 Voice Chat", "📄 Document Analysis"]
+_VOICE_COLS = (1, 1, 1, 1)
+
+# Sliding window over chat history: the session keeps at most
+# _HISTORY_MAX turns (older ones spill to a JSONL archive) and each run
+# renders only the last _HISTORY_RENDER, so per-rerun cost stays bounded
+_HISTORY_MAX = 200
+_HISTORY_RENDER = 50
+_HISTORY_ARCHIVE_TPL = 'chat_archive_{}.jsonl'
+
+# Heavyweight subsystems are process-wide singletons shared across browser
+# sessions: models, pygame/pyttsx3 and microphone calibration are paid once
+# per server instead of once per session. Only chat_history stays per-user.
+# Each factory imports its module lazily so cold start pays only for the
+# subsystems the selected mode actually touches.
+@st.cache_resource
+def get_emotion_detector():
+    try:
+        from emotion_detector import EmotionDetector
+        return EmotionDetector()
+    except Exception as e:
+        st.warning(f"Emotion detection not available: {e}")
+        return None
+
+@st.cache_resource
+def get_speech_processor():
+    try:
+        from speech_processor import SpeechProcessor
+        return SpeechProcessor()
+    except Exception as e:
+        st.warning(f"Speech processing not available: {e}")
+        return None
+
+@st.cache_resource
+def get_document_processor():
+    try:
+        from document_processor import DocumentProcessor
+        return DocumentProcessor()
+    except Exception as e:
+        st.warning(f"Document processing not available: {e}")
+        return None
+
+@st.cache_resource
+def get_rag_system():
+    try:
+        from rag_system import RAGSystem
+        return RAGSystem()
+    except Exception as e:
+        st.warning(f"RAG system not available: {e}")
+        return None
+
+_SUBSYSTEM_FACTORIES = {
+    'emotion_detector': get_emotion_detector,
+    'speech_processor': get_speech_processor,
+    'document_processor': get_document_processor,
+    'rag_system': get_rag_system,
+}
+
+def _ensure_subsystems(*names):
+    """Bind the named subsystems into session state on first use"""
+    for name in names:
+        if name not in st.session_state:
+            st.session_state[name] = _SUBSYSTEM_FACTORIES[name]()
 
 # Initialize session state
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
-if 'emotion_detector' not in st.session_state:
-    if EMOTION_AVAILABLE:
-        try:
-            st.session_state.emotion_detector = EmotionDetector()
-        except Exception as e:
-            st.warning(f"Emotion detector initialization failed: {e}")
-            st.session_state.emotion_detector = None
-    else:
-        st.session_state.emotion_detector = None
-if 'speech_processor' not in st.session_state:
-    if SPEECH_AVAILABLE:
-        try:
-            st.session_state.speech_processor = SpeechProcessor()
-        except Exception as e:
-            st.warning(f"Speech processor initialization failed: {e}")
-            st.session_state.speech_processor = None
-    else:
-        st.session_state.speech_processor = None
-if 'document_processor' not in st.session_state:
-    if DOCUMENT_AVAILABLE:
-        try:
-            st.session_state.document_processor = DocumentProcessor()
-        except Exception as e:
-            st.warning(f"Document processor initialization failed: {e}")
-            st.session_state.document_processor = None
-    else:
-        st.session_state.document_processor = None
-if 'rag_system' not in st.session_state:
-    if RAG_AVAILABLE:
-        try:
-            st.session_state.rag_system = RAGSystem()
-        except Exception as e:
-            st.warning(f"RAG system initialization failed: {e}")
-            st.session_state.rag_system = None
-    else:
-        st.session_state.rag_system = None
+
+def _safe_secrets(key):
+    """Read a Streamlit secret without raising when no secrets file exists"""
+    try:
+        return st.secrets.get(key)
+    except Exception:
+        return None
+
+@st.cache_data(ttl=3600)
+def _resolve_keys():
+    """Parse .env and resolve API keys once, cached across reruns"""
+    try:
+        env = dotenv_values('.env')
+    except Exception:
+        env = {}
+
+    return {
+        'GOOGLE_API_KEY': env.get('GOOGLE_API_KEY') or os.getenv('GOOGLE_API_KEY') or _safe_secrets('GOOGLE_API_KEY'),
+        'OPENAI_API_KEY': env.get('OPENAI_API_KEY') or os.getenv('OPENAI_API_KEY') or _safe_secrets('OPENAI_API_KEY')
+    }
 
 def main():
-    st.set_page_config(
-        page_title="EmotiBot - AI Emotional Companion",
-        page_icon="🤖",
-        layout="wide"
-    )
+    st.set_page_config(**_PAGE_CFG)
     
     st.title("🤖 EmotiBot - AI Emotional Companion")
-    st.markdown("Welcome to EmotiBot! Your AI-powered emotional conversation companion with speech and document processing capabilities.")
+    st.markdown(_WELCOME_MD)
     
-    # Check API key
-    google_api_key = os.getenv("GOOGLE_API_KEY")
-    if not google_api_key:
-        try:
-            google_api_key = st.secrets["GOOGLE_API_KEY"]
-        except:
-            pass
+    # Check API key (resolved once and cached across reruns)
+    google_api_key = _resolve_keys()['GOOGLE_API_KEY']
     
     if not google_api_key:
         st.error("❌ Google API Key not found. Please set GOOGLE_API_KEY in your .env file.")
@@ -114,21 +172,20 @@ def main():
         st.title("🎛️ Controls")
         
         # Mode selection
-        mode = st.selectbox(
-            "Interaction Mode",
-            ["💬 Text Chat", "🎤 Voice Chat", "📄 Document Analysis"]
-        )
+        mode = st.selectbox("Interaction Mode", _MODES)
         
         # System status
         st.subheader("🔧 System Status")
         st.success("✅ Google AI: Connected")
         
-        if st.session_state.speech_processor:
+        if st.session_state.get('speech_processor'):
             st.success("✅ Speech: Available")
-        else:
+        elif 'speech_processor' in st.session_state:
             st.warning("⚠️ Speech: Limited (text only)")
+        else:
+            st.info("💤 Speech: Loads on first use")
         
-        if st.session_state.rag_system:
+        if st.session_state.get('rag_system'):
             st.success("✅ RAG System: Available")
             
             # Show collection stats
@@ -138,8 +195,30 @@ def main():
                     st.info(f"📊 Knowledge Base: {stats['total_items']} items")
             except:
                 st.info("📊 Knowledge Base: Available")
-        else:
+        elif 'rag_system' in st.session_state:
             st.warning("⚠️ RAG System: Limited (using direct AI)")
+        else:
+            st.info("💤 RAG System: Loads on first use")
+        
+        # Response cache stats
+        cache_stats = _get_response_cache().stats()
+        if cache_stats['hits'] or cache_stats['misses']:
+            st.info(f"⚡ Response cache: {cache_stats['hits']} hits ({cache_stats['hit_rate']:.0%})")
+        
+        # Background indexing status
+        pending = st.session_state.get('pending_indexes', [])
+        if pending:
+            still_pending = []
+            for filename, future in pending:
+                if future.done():
+                    if future.exception() is None and future.result():
+                        st.success(f"✅ Indexed '{filename}'")
+                    else:
+                        st.error(f"❌ Indexing failed for '{filename}'")
+                else:
+                    st.info(f"⏳ Indexing '{filename}'...")
+                    still_pending.append((filename, future))
+            st.session_state.pending_indexes = still_pending
         
         # Clear chat history
         if st.button("🗑️ Clear Chat History"):
@@ -154,46 +233,105 @@ def main():
     elif mode == "📄 Document Analysis":
         document_analysis_interface()
 
+def render_chat_entry(chat):
+    """Render one user/assistant exchange"""
+    # User message
+    with st.chat_message("user"):
+        st.write(chat['user_message'])
+    
+    # Bot response with emotions
+    with st.chat_message("assistant"):
+        st.write(chat['bot_response'])
+        
+        # Show emotion analysis if available
+        if 'emotions' in chat:
+            emotions = chat['emotions']
+            if emotions.get('dominant_emotion'):
+                emotion_text = f"🎭 Detected emotion: {emotions['dominant_emotion']} ({emotions.get('confidence', 0):.2f})"
+                st.caption(emotion_text)
+
+def _archive_path():
+    """Archive file for this session; sessions must never share spilled turns"""
+    if 'archive_id' not in st.session_state:
+        st.session_state.archive_id = uuid.uuid4().hex
+    return _HISTORY_ARCHIVE_TPL.format(st.session_state.archive_id)
+
+def _append_history(chat_entry):
+    """Append a turn, spilling the oldest turns past the window to disk"""
+    history = st.session_state.chat_history
+    history.append(chat_entry)
+
+    while len(history) > _HISTORY_MAX:
+        oldest = history.pop(0)
+        try:
+            with open(_archive_path(), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(oldest) + '\n')
+            # Only a count stays in the session; the turns live on disk
+            st.session_state.archived_count = st.session_state.get('archived_count', 0) + 1
+        except Exception:
+            pass
+
+def _load_archived_history():
+    """Hydrate this session's archived turns back from its JSONL archive"""
+    try:
+        with open(_archive_path(), 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except Exception:
+        return []
+
+def _render_chat_history(chat_container):
+    """Render the recent window of chat history into its container"""
+    with chat_container:
+        history = st.session_state.chat_history
+        
+        # Earlier turns render only when explicitly requested; unlike an
+        # expander body, this branch does not execute on ordinary reruns
+        earlier_count = st.session_state.get('archived_count', 0) + max(len(history) - _HISTORY_RENDER, 0)
+        if earlier_count and st.checkbox(f"Load earlier messages ({earlier_count})"):
+            for chat in _load_archived_history():
+                render_chat_entry(chat)
+            for chat in history[:-_HISTORY_RENDER]:
+                render_chat_entry(chat)
+
+        for chat in history[-_HISTORY_RENDER:]:
+            render_chat_entry(chat)
+
+# On Streamlit >= 1.33 scope history rendering to a fragment so chat
+# updates re-execute only this block, not the sidebar and key checks
+if hasattr(st, 'fragment'):
+    _render_chat_history = st.fragment(_render_chat_history)
+
 def text_chat_interface():
     """Text-based chat interface"""
     st.subheader("💬 Text Chat")
     
+    _ensure_subsystems('emotion_detector', 'rag_system')
+    
     # Chat container
     chat_container = st.container()
     
     # Display chat history
-    with chat_container:
-        for chat in st.session_state.chat_history:
-            # User message
-            with st.chat_message("user"):
-                st.write(chat['user_message'])
-            
-            # Bot response with emotions
-            with st.chat_message("assistant"):
-                st.write(chat['bot_response'])
-                
-                # Show emotion analysis if available
-                if 'emotions' in chat:
-                    emotions = chat['emotions']
-                    if emotions.get('dominant_emotion'):
-                        emotion_text = f"🎭 Detected emotion: {emotions['dominant_emotion']} ({emotions.get('confidence', 0):.2f})"
-                        st.caption(emotion_text)
+    _render_chat_history(chat_container)
     
     # Chat input
     user_input = st.chat_input("Type your message here...")
     
     if user_input:
-        process_text_message(user_input)
+        # Stream the new exchange straight into the page - no st.rerun, so
+        # the whole script (and full history) is not re-executed per turn
+        process_text_message_streaming(user_input, chat_container)
 
 def voice_chat_interface():
     """Voice-based chat interface"""
     st.subheader("🎤 Voice Chat")
     
+    _ensure_subsystems('speech_processor', 'emotion_detector', 'rag_system')
+    
     if not st.session_state.speech_processor:
         st.error("Speech processing is not available. Please check your system setup.")
         return
     
-    col1, col2, col3 = st.columns([1, 1, 1])
+    col1, col2, col3, col4 = st.columns(_VOICE_COLS)
     
     with col1:
         if st.button("🎤 Start Recording", type="primary"):
@@ -207,6 +345,48 @@ def voice_chat_interface():
         if st.button("🧪 Test Speech System"):
             test_speech_system()
     
+    with col4:
+        if st.button("🔇 Stop"):
+            st.session_state.speech_processor.stop_speaking()
+    
+    # Poll the background capture; the Streamlit worker stays free to
+    # serve other sessions while the pool thread listens
+    pending = st.session_state.get('pending_voice')
+    if pending is not None:
+        if pending.done():
+            st.session_state.pending_voice = None
+            
+            try:
+                recognized_text = pending.result()
+            except Exception as e:
+                st.error(f"Speech processing error: {e}")
+                recognized_text = None
+            
+            if recognized_text:
+                st.success(f"🎤 Heard: {recognized_text}")
+                
+                # Process the message
+                process_text_message(recognized_text)
+                
+                # Speak the response on a background thread so the worker
+                # is free while the utterance plays out
+                if st.session_state.chat_history:
+                    latest_response = st.session_state.chat_history[-1]['bot_response']
+                    tts_thread = threading.Thread(
+                        target=st.session_state.speech_processor.speak_text,
+                        args=(latest_response,),
+                        daemon=True
+                    )
+                    tts_thread.start()
+                    st.session_state.tts_thread = tts_thread
+                    st.info("🔊 Speaking response...")
+            else:
+                st.warning("No speech detected or could not understand audio")
+        else:
+            with st.status("🎤 Listening...", expanded=False):
+                time.sleep(0.2)
+            st.rerun()
+    
     # Display chat history
     for chat in st.session_state.chat_history:
         with st.chat_message("user"):
@@ -225,6 +405,8 @@ def document_analysis_interface():
     """Document analysis interface"""
     st.subheader("📄 Document Analysis")
     
+    _ensure_subsystems('document_processor', 'rag_system')
+    
     # File upload
     uploaded_file = st.file_uploader(
         "Upload a document",
@@ -246,42 +428,198 @@ def document_analysis_interface():
         if doc_question and st.button("🔍 Search Documents"):
             search_documents(doc_question)
 
+@st.cache_resource
+def get_gemini_model():
+    """Process-wide Gemini model handle for the fallback path"""
+    return genai.GenerativeModel('gemini-pro')
+
+def build_fallback_prompt(user_input, emotions=None):
+    """Build the emotion-aware prompt for direct Gemini responses"""
+    emotion_context = ""
+    if emotions and emotions.get('dominant_emotion'):
+        emotion = emotions['dominant_emotion']
+        confidence = emotions.get('confidence', 0)
+        emotion_context = f"The user seems to be feeling {emotion} (confidence: {confidence:.2f}). "
+    
+    return f"""You are EmotiBot, an empathetic AI companion. {emotion_context}Please respond compassionately and helpfully to the user's message.
+
+User message: {user_input}
+
+Please provide a caring, supportive response:"""
+
+def _fallback_cache_key(user_input, emotions=None):
+    """Cache key for a fallback response"""
+    return ResponseCache.make_key(user_input, (emotions or {}).get('dominant_emotion', ''))
+
 def generate_fallback_response(user_input, emotions=None):
     """Generate response using direct Gemini when RAG is not available"""
+    cache_key = _fallback_cache_key(user_input, emotions)
+    cached = _get_response_cache().get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        model = genai.GenerativeModel('gemini-pro')
+        model = get_gemini_model()
         
-        # Create emotion-aware prompt
-        emotion_context = ""
-        if emotions and emotions.get('dominant_emotion'):
-            emotion = emotions['dominant_emotion']
-            confidence = emotions.get('confidence', 0)
-            emotion_context = f"The user seems to be feeling {emotion} (confidence: {confidence:.2f}). "
+        response = model.generate_content(build_fallback_prompt(user_input, emotions))
+        _get_response_cache().put(cache_key, response.text)
+        return response.text
         
-        prompt = f"""You are EmotiBot, an empathetic AI companion. {emotion_context}Please respond compassionately and helpfully to the user's message.
+    except Exception as e:
+        return f"I'm sorry, I'm having trouble generating a response right now. Error: {str(e)}"
 
-User message: {user_input}
+def stream_fallback_response(user_input, emotions=None):
+    """Yield Gemini response chunks as they arrive instead of waiting for full text"""
+    cache_key = _fallback_cache_key(user_input, emotions)
+    cached = _get_response_cache().get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+    
+    try:
+        model = get_gemini_model()
+        
+        response = model.generate_content(build_fallback_prompt(user_input, emotions), stream=True)
+        parts = []
+        for chunk in response:
+            if chunk.text:
+                parts.append(chunk.text)
+                yield chunk.text
+        
+        if parts:
+            _get_response_cache().put(cache_key, ''.join(parts))
+        
+    except Exception as e:
+        yield f"I'm sorry, I'm having trouble generating a response right now. Error: {str(e)}"
 
-Please provide a caring, supportive response:"""
+def _semantic_lookup(user_input):
+    """Embed a message and check the semantic cache for a near-duplicate"""
+    rag_system = st.session_state.get('rag_system')
+    if not rag_system:
+        return None, None
+    
+    try:
+        embedding = rag_system._embed_one(user_input)
+    except Exception:
+        return None, None
+    
+    if embedding is None:
+        return None, None
+    
+    cached = _get_semantic_cache().get(embedding)
+    
+    # Fall through to the disk layer and warm the in-memory cache on hit
+    persistent = _get_persistent_cache()
+    if cached is None and persistent is not None:
+        cached = persistent.get(embedding)
+        if cached is not None:
+            _get_semantic_cache().put(embedding, cached)
+    
+    return embedding, cached
+
+def _semantic_store(embedding, user_input, value):
+    """Store a finished exchange in both semantic cache layers"""
+    _get_semantic_cache().put(embedding, value)
+    persistent = _get_persistent_cache()
+    if persistent is not None:
+        persistent.put(embedding, user_input, value)
+
+def _analyze_and_retrieve(user_input):
+    """Run emotion analysis and RAG retrieval concurrently
+
+    Neither feeds the other - emotions only shape the final prompt - so
+    the slower of the two is hidden behind the faster one.
+    """
+    detector = st.session_state.get('emotion_detector')
+    rag_system = st.session_state.get('rag_system')
+    
+    emotion_future = _get_analysis_pool().submit(detector.analyze_text, user_input) if detector else None
+    hits_future = _get_analysis_pool().submit(rag_system.search_similar, user_input, 5) if rag_system else None
+    
+    if emotion_future is not None:
+        emotions = emotion_future.result()
+    else:
+        emotions = {'dominant_emotion': 'neutral', 'confidence': 0.5}
+    
+    hits = hits_future.result() if hits_future is not None else None
+    
+    return emotions, hits
+
+def process_text_message_streaming(user_input, chat_container):
+    """Process a text message, streaming the response tokens into the page"""
+    try:
+        # Near-duplicate of an earlier message: replay the cached exchange
+        embedding, cached = _semantic_lookup(user_input)
+        if cached is not None:
+            chat_entry = {
+                'user_message': user_input,
+                'bot_response': cached['bot_response'],
+                'emotions': cached['emotions'],
+                'timestamp': time.time()
+            }
+            with chat_container:
+                render_chat_entry(chat_entry)
+            _append_history(chat_entry)
+            return chat_entry
         
-        response = model.generate_content(prompt)
-        return response.text
+        # Analyze emotions and retrieve context in parallel
+        emotions, hits = _analyze_and_retrieve(user_input)
+        
+        with chat_container:
+            with st.chat_message("user"):
+                st.write(user_input)
+            
+            with st.chat_message("assistant"):
+                if st.session_state.rag_system:
+                    bot_response = st.write_stream(
+                        st.session_state.rag_system.generate_response_stream(user_input, emotions, hits=hits)
+                    )
+                else:
+                    # Render tokens as they arrive; write_stream returns
+                    # the accumulated full text for the history entry
+                    bot_response = st.write_stream(stream_fallback_response(user_input, emotions))
+                
+                if emotions.get('dominant_emotion'):
+                    st.caption(f"🎭 Detected emotion: {emotions['dominant_emotion']} ({emotions.get('confidence', 0):.2f})")
+        
+        chat_entry = {
+            'user_message': user_input,
+            'bot_response': bot_response,
+            'emotions': emotions,
+            'timestamp': time.time()
+        }
+        _append_history(chat_entry)
+        
+        if embedding is not None:
+            _semantic_store(embedding, user_input, {'bot_response': bot_response, 'emotions': emotions})
+        
+        return chat_entry
         
     except Exception as e:
-        return f"I'm sorry, I'm having trouble generating a response right now. Error: {str(e)}"
+        st.error(f"Error processing message: {e}")
+        return None
 
 def process_text_message(user_input):
     """Process a text message and generate response"""
     try:
-        # Analyze emotions
-        if st.session_state.emotion_detector:
-            emotions = st.session_state.emotion_detector.analyze_text(user_input)
-        else:
-            emotions = {'dominant_emotion': 'neutral', 'confidence': 0.5}
+        # Near-duplicate of an earlier message: replay the cached exchange
+        embedding, cached = _semantic_lookup(user_input)
+        if cached is not None:
+            chat_entry = {
+                'user_message': user_input,
+                'bot_response': cached['bot_response'],
+                'emotions': cached['emotions'],
+                'timestamp': time.time()
+            }
+            _append_history(chat_entry)
+            return chat_entry
+        
+        # Analyze emotions and retrieve context in parallel
+        emotions, hits = _analyze_and_retrieve(user_input)
         
         # Generate response
         if st.session_state.rag_system:
-            bot_response = st.session_state.rag_system.generate_response(user_input, emotions)
+            bot_response = st.session_state.rag_system.generate_response(user_input, emotions, hits=hits)
         else:
             # Use fallback response generation
             bot_response = generate_fallback_response(user_input, emotions)
@@ -293,41 +631,27 @@ def process_text_message(user_input):
             'emotions': emotions,
             'timestamp': time.time()
         }
-        st.session_state.chat_history.append(chat_entry)
+        _append_history(chat_entry)
         
-        # Rerun to update display
-        st.rerun()
+        if embedding is not None:
+            _semantic_store(embedding, user_input, {'bot_response': bot_response, 'emotions': emotions})
+        
+        return chat_entry
         
     except Exception as e:
         st.error(f"Error processing message: {e}")
+        return None
 
 def record_and_process_speech():
-    """Record speech and process it"""
+    """Kick off speech capture on the background pool"""
     if not st.session_state.speech_processor:
         st.error("Speech processor not available")
         return
     
-    try:
-        with st.spinner("🎤 Listening... (5 seconds)"):
-            # Record speech
-            recognized_text = st.session_state.speech_processor.listen_for_speech(timeout=5)
-        
-        if recognized_text:
-            st.success(f"🎤 Heard: {recognized_text}")
-            
-            # Process the message
-            process_text_message(recognized_text)
-            
-            # Speak the response
-            if st.session_state.chat_history:
-                latest_response = st.session_state.chat_history[-1]['bot_response']
-                with st.spinner("🔊 Speaking response..."):
-                    st.session_state.speech_processor.speak_text(latest_response)
-        else:
-            st.warning("No speech detected or could not understand audio")
-            
-    except Exception as e:
-        st.error(f"Speech processing error: {e}")
+    if st.session_state.get('pending_voice') is None:
+        st.session_state.pending_voice = _get_voice_pool().submit(
+            st.session_state.speech_processor.listen_for_speech, 5
+        )
 
 def test_text_to_speech():
     """Test text-to-speech functionality"""
@@ -377,25 +701,33 @@ def process_uploaded_document(uploaded_file):
         return
         
     try:
-        # Read file content
-        file_content = uploaded_file.read()
         file_type = uploaded_file.type
         
-        # Extract text
+        # Extract text. PDF/DOCX are spooled to a temp file (disk-backed
+        # past 8 MB) and parsed from the handle, so a large upload never
+        # sits fully in RAM as a bytes copy
         if 'pdf' in file_type:
-            text = st.session_state.document_processor.read_pdf_from_bytes(file_content)
+            with tempfile.SpooledTemporaryFile(max_size=8 << 20) as tmp:
+                shutil.copyfileobj(uploaded_file, tmp, length=1 << 20)
+                tmp.seek(0)
+                text = st.session_state.document_processor.read_pdf_stream(tmp)
         elif 'word' in file_type or 'docx' in file_type:
-            text = st.session_state.document_processor.read_docx_from_bytes(file_content)
-        else:  # txt
-            text = file_content.decode('utf-8')
+            with tempfile.SpooledTemporaryFile(max_size=8 << 20) as tmp:
+                shutil.copyfileobj(uploaded_file, tmp, length=1 << 20)
+                tmp.seek(0)
+                text = st.session_state.document_processor.read_docx_stream(tmp)
+        else:  # txt: stream-decode, skipping the intermediate bytes copy
+            uploaded_file.seek(0)
+            text = io.TextIOWrapper(uploaded_file, encoding='utf-8', errors='replace').read()
         
         if not text:
             st.error("Could not extract text from document")
             return
         
-        # Display preview
+        # Display preview (built once, reused below)
+        preview = text[:1000] + "..." if len(text) > 1000 else text
         st.subheader("📄 Document Preview")
-        st.text_area("Content preview:", text[:1000] + "..." if len(text) > 1000 else text, height=150)
+        st.text_area("Content preview:", preview, height=150)
         
         # Store in session state for current session use
         if 'current_document' not in st.session_state:
@@ -407,7 +739,8 @@ def process_uploaded_document(uploaded_file):
             'file_type': file_type
         }
         
-        # Add to knowledge base
+        # Add to knowledge base in the background; embedding scales with
+        # document size and should not block the upload UI
         if st.session_state.rag_system:
             metadata = {
                 'filename': uploaded_file.name,
@@ -415,12 +748,10 @@ def process_uploaded_document(uploaded_file):
                 'upload_time': time.time()
             }
             
-            success = st.session_state.rag_system.add_document(text, metadata)
+            future = _get_index_pool().submit(st.session_state.rag_system.add_document, text, metadata)
+            st.session_state.setdefault('pending_indexes', []).append((uploaded_file.name, future))
             
-            if success:
-                st.success(f"✅ Document '{uploaded_file.name}' added to knowledge base!")
-            else:
-                st.error("Failed to add document to knowledge base")
+            st.info(f"📥 Indexing '{uploaded_file.name}' in the background - you can keep chatting meanwhile")
         else:
             st.warning("⚠️ RAG system not available - document processed but not stored for future reference")
             st.info("💡 You can still ask questions about this document in the current session")
@@ -440,6 +771,13 @@ def search_documents(question):
             results = st.session_state.rag_system.search_similar(question, n_results=3)
         
         if results:
+            # Blend vector score with lexical overlap, scored for all hits
+            # in one vectorized pass, so keyword-exact matches rank first
+            lexical = similarities_batch(question, [r['document'] for r in results])
+            for result, overlap in zip(results, lexical):
+                result['score'] = (1 - result['distance']) + float(overlap)
+            results.sort(key=lambda r: r['score'], reverse=True)
+            
             st.subheader("🔍 Search Results")
             
             for i, result in enumerate(results, 1):
@@ -450,9 +788,10 @@ def search_documents(question):
                     if 'filename' in metadata:
                         st.caption(f"Source: {metadata['filename']}")
             
-            # Generate answer based on search results
+            # Generate answer from the hits already retrieved above so the
+            # vector store is queried once per question, not twice
             with st.spinner("🤖 Generating answer..."):
-                answer = st.session_state.rag_system.generate_response(question)
+                answer = st.session_state.rag_system.generate_response(question, hits=results)
             
             st.subheader("🤖 EmotiBot's Answer")
             st.write(answer)
@@ -3,11 +3,52 @@ Utility functions for EmotiBot
 """
 import os
 import json
+import hashlib
 import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
 import re
 import unicodedata
+import numpy as np
+
+# Optional indexed KNN for the persistent semantic cache; without it the
+# cache falls back to a brute-force numpy scan over stored embeddings
+try:
+    import sqlite_vec
+    SQLITE_VEC_AVAILABLE = True
+except Exception:
+    SQLITE_VEC_AVAILABLE = False
+    sqlite_vec = None
+
+# Prefer the C-backed orjson serializer when available; fall back to json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Hot-path regexes compiled once at import instead of per call
+_WS_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+_FN_BAD_RE = re.compile(r'[<>:"/\\|?*]')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Maps vertical whitespace to spaces so runs collapse in one C pass
+_WS_TRANS = str.maketrans({c: ' ' for c in '\t\n\r\x0b\x0c'})
+
+# Common words skipped during keyword extraction
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before', 'after',
+    'above', 'below', 'between', 'among', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'
+})
 
 def setup_logging(log_level: str = "INFO", log_file: str = None) -> logging.Logger:
     """
@@ -51,11 +92,16 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
+    # ASCII text (the common case for extracted documents) needs no unicode
+    # normalization; translate + split/join collapse whitespace in C
+    if text.isascii():
+        return ' '.join(text.translate(_WS_TRANS).split())
+    
     # Normalize unicode characters
     text = unicodedata.normalize('NFKD', text)
     
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     
     # Strip leading/trailing whitespace
     text = text.strip()
@@ -112,8 +158,13 @@ def save_json(data: Any, file_path: str) -> bool:
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if ORJSON_AVAILABLE:
+            # Serialize in one C-level pass without building Python strings
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
         
         return True
         
@@ -135,6 +186,10 @@ def load_json(file_path: str) -> Optional[Any]:
         if not os.path.exists(file_path):
             return None
         
+        if ORJSON_AVAILABLE:
+            with open(file_path, 'rb') as f:
+                return orjson.loads(f.read())
+        
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
         
@@ -208,31 +263,20 @@ def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
     if not text:
         return []
     
-    # Simple keyword extraction - remove common words and extract meaningful terms
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-        'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before', 'after',
-        'above', 'below', 'between', 'among', 'is', 'are', 'was', 'were', 'be', 'been',
-        'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-        'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'
-    }
-    
     # Extract words
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    
-    # Filter out stop words and get unique words
-    keywords = []
-    seen = set()
+    words = _WORD_RE.findall(text.lower())
     
+    # A dict doubles as ordered set, so one structure handles both
+    # dedup and insertion order
+    keywords = {}
     for word in words:
-        if word not in stop_words and word not in seen:
-            keywords.append(word)
-            seen.add(word)
-            
-            if len(keywords) >= max_keywords:
-                break
+        if word in _STOP_WORDS:
+            continue
+        keywords[word] = None
+        if len(keywords) >= max_keywords:
+            break
     
-    return keywords
+    return list(keywords)
 
 def validate_email(email: str) -> bool:
     """
@@ -244,8 +288,7 @@ def validate_email(email: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return bool(_EMAIL_RE.match(email))
 
 def sanitize_filename(filename: str) -> str:
     """
@@ -258,7 +301,7 @@ def sanitize_filename(filename: str) -> str:
         Sanitized filename
     """
     # Remove or replace invalid characters
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = _FN_BAD_RE.sub('_', filename)
     
     # Remove leading/trailing spaces and dots
     filename = filename.strip(' .')
@@ -270,18 +313,22 @@ def sanitize_filename(filename: str) -> str:
     
     return filename
 
-def chunk_list(lst: List[Any], chunk_size: int) -> List[List[Any]]:
+def chunk_list(lst: List[Any], chunk_size: int) -> Iterator[List[Any]]:
     """
-    Split list into chunks
+    Split list into chunks lazily
+    
+    Yields one slice at a time so large lists are never duplicated in
+    memory; wrap in list() when random access to the chunks is needed.
     
     Args:
         lst: Input list
         chunk_size: Size of each chunk
         
-    Returns:
-        List of chunks
+    Yields:
+        Successive chunks of the list
     """
-    return [lst[i:i + chunk_size] for i in range(0, len(lst), chunk_size)]
+    for i in range(0, len(lst), chunk_size):
+        yield lst[i:i + chunk_size]
 
 def merge_dicts(dict1: Dict, dict2: Dict) -> Dict:
     """
@@ -320,6 +367,75 @@ def get_user_input(prompt: str, valid_options: List[str] = None) -> str:
         
         print(f"Invalid option. Please choose from: {', '.join(valid_options)}")
 
+# Fixed-seed permutation parameters so MinHash signatures are comparable
+# across processes and restarts
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MINHASH_RNG = np.random.default_rng(1)
+_MINHASH_A = _MINHASH_RNG.integers(1, int(_MERSENNE_PRIME), size=128, dtype=np.uint64)
+_MINHASH_B = _MINHASH_RNG.integers(0, int(_MERSENNE_PRIME), size=128, dtype=np.uint64)
+
+def minhash(tokens: List[str], num_perm: int = 128) -> np.ndarray:
+    """
+    Compute a MinHash signature for a set of tokens
+    
+    Each token is hashed once, then pushed through num_perm fixed affine
+    permutations in a single vectorized step; the signature is the
+    elementwise minimum over all tokens.
+    
+    Args:
+        tokens: Tokens to summarize
+        num_perm: Number of permutations (signature length, max 128)
+        
+    Returns:
+        uint64 signature array of length num_perm
+    """
+    a = _MINHASH_A[:num_perm]
+    b = _MINHASH_B[:num_perm]
+    signature = np.full(num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+    
+    for token in set(tokens):
+        base = np.frombuffer(
+            hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), dtype=np.uint64
+        )[0]
+        np.minimum(signature, (a * base + b) % _MERSENNE_PRIME, out=signature)
+    
+    return signature
+
+def calculate_similarity_minhash(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """
+    Estimate Jaccard similarity from two MinHash signatures
+    
+    Args:
+        sig_a: First signature
+        sig_b: Second signature
+        
+    Returns:
+        Estimated similarity (0-1)
+    """
+    if sig_a.size == 0 or sig_a.size != sig_b.size:
+        return 0.0
+    
+    return float((sig_a == sig_b).mean())
+
+def hash_tokens(text: str) -> np.ndarray:
+    """
+    Hash the unique words of a text to a sorted uint32 array
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Sorted array of unique token hashes
+    """
+    if not text:
+        return np.empty(0, dtype=np.uint32)
+    
+    hashes = [
+        np.frombuffer(hashlib.blake2b(word.encode('utf-8'), digest_size=4).digest(), dtype=np.uint32)[0]
+        for word in set(text.lower().split())
+    ]
+    return np.sort(np.asarray(hashes, dtype=np.uint32))
+
 def calculate_similarity(text1: str, text2: str) -> float:
     """
     Calculate simple similarity between two texts
@@ -334,46 +450,325 @@ def calculate_similarity(text1: str, text2: str) -> float:
     if not text1 or not text2:
         return 0.0
     
-    # Simple word-based similarity
-    words1 = set(text1.lower().split())
-    words2 = set(text2.lower().split())
-    
-    intersection = words1.intersection(words2)
-    union = words1.union(words2)
+    # Jaccard over hashed token sets; the set ops run in C on sorted arrays
+    tokens1 = hash_tokens(text1)
+    tokens2 = hash_tokens(text2)
     
-    if not union:
+    union = np.union1d(tokens1, tokens2)
+    if union.size == 0:
         return 0.0
     
-    return len(intersection) / len(union)
+    return np.intersect1d(tokens1, tokens2, assume_unique=True).size / union.size
+
+def similarities_batch(query: str, texts: List[str]) -> np.ndarray:
+    """
+    Jaccard similarity of a query against many texts in one sweep
+    
+    The query is tokenized and hashed once, then compared against each
+    candidate with vectorized set operations.
+    
+    Args:
+        query: Query text
+        texts: Candidate texts to score
+        
+    Returns:
+        Array of similarity scores (0-1), one per candidate
+    """
+    query_tokens = hash_tokens(query)
+    scores = np.zeros(len(texts), dtype=np.float64)
+    
+    if query_tokens.size == 0:
+        return scores
+    
+    for i, text in enumerate(texts):
+        doc_tokens = hash_tokens(text)
+        union_size = np.union1d(query_tokens, doc_tokens).size
+        if union_size:
+            scores[i] = np.intersect1d(query_tokens, doc_tokens, assume_unique=True).size / union_size
+    
+    return scores
+
+class ResponseCache:
+    """LRU response cache with TTL and hit-rate statistics"""
+    
+    def __init__(self, max_size: int = 512, ttl: float = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+    
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Build a cache key by hashing the given string parts"""
+        return hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on miss/expiry"""
+        entry = self._entries.get(key)
+        
+        if entry is None:
+            self._misses += 1
+            return None
+        
+        value, expires_at = entry
+        if time.time() > expires_at:
+            del self._entries[key]
+            self._misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+    
+    def put(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entry if full"""
+        self._entries[key] = (value, time.time() + self.ttl)
+        self._entries.move_to_end(key)
+        
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit-rate statistics"""
+        total = self._hits + self._misses
+        return {
+            'size': len(self._entries),
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self._hits / total if total else 0.0
+        }
+
+class SemanticCache:
+    """
+    Cache for near-duplicate queries using random-projection LSH
+    
+    Embeddings are bucketed by their sign bits under several random
+    gaussian projections; candidates sharing a bucket are verified by
+    cosine similarity before a hit is returned, so paraphrases like
+    "I feel sad" and "I'm sad" can share one cached response.
+    """
+    
+    def __init__(self, dim: int = 384, num_tables: int = 8, num_bits: int = 16,
+                 similarity_threshold: float = 0.95, max_size: int = 512, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.similarity_threshold = similarity_threshold
+        self.max_size = max_size
+        self._planes = rng.standard_normal((num_tables, num_bits, dim))
+        self._bit_weights = (1 << np.arange(num_bits, dtype=np.uint32))
+        self._tables = [{} for _ in range(num_tables)]
+        self._entries = []
+    
+    def _bucket_keys(self, embedding: np.ndarray) -> np.ndarray:
+        """Per-table bucket keys for an embedding"""
+        signs = (self._planes @ embedding) > 0
+        return (signs.astype(np.uint32) * self._bit_weights).sum(axis=1)
+    
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+    
+    def get(self, embedding: np.ndarray) -> Optional[Any]:
+        """Return the cached value for the nearest stored embedding, if close enough"""
+        embedding = self._normalize(np.asarray(embedding, dtype=np.float64))
+        
+        candidates = set()
+        for table, key in zip(self._tables, self._bucket_keys(embedding)):
+            candidates.update(table.get(int(key), ()))
+        
+        best_value = None
+        best_similarity = self.similarity_threshold
+        for index in candidates:
+            stored_embedding, value = self._entries[index]
+            similarity = float(stored_embedding @ embedding)
+            if similarity >= best_similarity:
+                best_similarity = similarity
+                best_value = value
+        
+        return best_value
+    
+    def put(self, embedding: np.ndarray, value: Any):
+        """Store a value under its embedding"""
+        # Coarse eviction: indices in the tables reference entry positions,
+        # so a full reset is simpler than tracking per-entry removal
+        if len(self._entries) >= self.max_size:
+            self._tables = [{} for _ in self._tables]
+            self._entries = []
+        
+        embedding = self._normalize(np.asarray(embedding, dtype=np.float64))
+        index = len(self._entries)
+        self._entries.append((embedding, value))
+        
+        for table, key in zip(self._tables, self._bucket_keys(embedding)):
+            table.setdefault(int(key), []).append(index)
+
+class PersistentSemanticCache:
+    """
+    Semantic cache backed by SQLite, surviving process restarts
+    
+    Entries pair a JSON value with its query embedding. Lookups run an
+    indexed KNN through sqlite-vec when the extension loads, else a
+    brute-force numpy cosine scan over the stored embeddings; either way
+    the nearest candidate is verified against the similarity threshold.
+    """
+    
+    def __init__(self, db_path: str = "cache.db", dim: int = 384,
+                 similarity_threshold: float = 0.95):
+        self.dim = dim
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses '
+            '(key TEXT PRIMARY KEY, query TEXT, value TEXT, embedding BLOB, ts REAL)'
+        )
+        self._conn.commit()
+        
+        self._vec = False
+        if SQLITE_VEC_AVAILABLE:
+            try:
+                self._conn.enable_load_extension(True)
+                sqlite_vec.load(self._conn)
+                self._conn.enable_load_extension(False)
+                self._conn.execute(
+                    'CREATE VIRTUAL TABLE IF NOT EXISTS vec_queries '
+                    f'USING vec0(embedding float[{dim}] distance_metric=cosine, +key TEXT)'
+                )
+                self._conn.commit()
+                self._vec = True
+            except Exception as e:
+                logging.warning(f"sqlite-vec unavailable, using brute-force scan: {e}")
+        
+        # Brute-force path keeps the embedding matrix in memory,
+        # invalidated on writes, so lookups avoid re-reading every BLOB
+        self._keys = None
+        self._matrix = None
+    
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+    
+    def _nearest_key(self, embedding: np.ndarray) -> Optional[str]:
+        """Key of the stored entry nearest to the embedding, unverified"""
+        if self._vec:
+            row = self._conn.execute(
+                'SELECT key FROM vec_queries WHERE embedding MATCH ? AND k = 1',
+                (embedding.tobytes(),)
+            ).fetchone()
+            return row[0] if row else None
+        
+        if self._matrix is None:
+            rows = self._conn.execute('SELECT key, embedding FROM responses').fetchall()
+            if not rows:
+                return None
+            self._keys = [row[0] for row in rows]
+            self._matrix = np.vstack([
+                np.frombuffer(row[1], dtype=np.float32) for row in rows
+            ])
+        
+        if self._matrix is None or not len(self._keys):
+            return None
+        
+        return self._keys[int(np.argmax(self._matrix @ embedding))]
+    
+    def get(self, embedding: np.ndarray) -> Optional[Any]:
+        """Return the stored value nearest the embedding, if close enough"""
+        try:
+            embedding = self._normalize(embedding)
+            
+            with self._lock:
+                key = self._nearest_key(embedding)
+                if key is None:
+                    return None
+                
+                row = self._conn.execute(
+                    'SELECT value, embedding FROM responses WHERE key = ?', (key,)
+                ).fetchone()
+            
+            if row is None:
+                return None
+            
+            stored = np.frombuffer(row[1], dtype=np.float32)
+            if float(stored @ embedding) < self.similarity_threshold:
+                return None
+            
+            return json.loads(row[0])
+            
+        except Exception as e:
+            logging.error(f"Error reading persistent semantic cache: {e}")
+            return None
+    
+    def put(self, embedding: np.ndarray, query: str, value: Any):
+        """Store a JSON-serializable value under its query embedding"""
+        try:
+            embedding = self._normalize(embedding)
+            key = hashlib.blake2b(query.encode('utf-8'), digest_size=16).hexdigest()
+            
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, query, value, embedding, ts) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, query, json.dumps(value), embedding.tobytes(), time.time())
+                )
+                if self._vec:
+                    self._conn.execute('DELETE FROM vec_queries WHERE key = ?', (key,))
+                    self._conn.execute(
+                        'INSERT INTO vec_queries (embedding, key) VALUES (?, ?)',
+                        (embedding.tobytes(), key)
+                    )
+                self._conn.commit()
+                
+                # Stale after a write; rebuilt lazily on next lookup
+                self._keys = None
+                self._matrix = None
+            
+        except Exception as e:
+            logging.error(f"Error writing persistent semantic cache: {e}")
 
 class Timer:
     """Simple timer context manager"""
     
     def __init__(self, description: str = "Operation"):
         self.description = description
-        self.start_time = None
+        self.start_ns = None
     
     def __enter__(self):
-        self.start_time = datetime.now()
+        # Monotonic nanosecond counter: immune to wall-clock jumps and
+        # avoids datetime/timedelta allocation per timed block
+        self.start_ns = time.perf_counter_ns()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.start_time:
-            duration = datetime.now() - self.start_time
-            print(f"{self.description} took {duration.total_seconds():.2f} seconds")
+        if self.start_ns is not None:
+            duration_s = (time.perf_counter_ns() - self.start_ns) / 1e9
+            print(f"{self.description} took {duration_s:.2f} seconds")
 
-def safe_divide(a: float, b: float, default: float = 0.0) -> float:
+def safe_divide(a, b, default: float = 0.0):
     """
     Safe division with default value for division by zero
     
+    Array inputs are divided elementwise in one vectorized call, with
+    zero denominators mapped to the default instead of raising or
+    dispatching through Python per element.
+    
     Args:
-        a: Numerator
-        b: Denominator
+        a: Numerator (scalar or array)
+        b: Denominator (scalar or array)
         default: Default value if division by zero
         
     Returns:
         Result of division or default value
     """
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        a = np.asarray(a, dtype=np.float64)
+        b = np.asarray(b, dtype=np.float64)
+        out = np.full(np.broadcast(a, b).shape, default, dtype=np.float64)
+        return np.divide(a, b, out=out, where=(b != 0))
+    
     try:
         return a / b if b != 0 else default
     except: